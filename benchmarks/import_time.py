@@ -0,0 +1,74 @@
+"""
+Measure the cost of importing the package in a fresh interpreter, and guard against
+regressions by failing when heavy modules are pulled in at import time.
+
+    python benchmarks/import_time.py [--repeat 5] [--max-ms 50]
+"""
+
+import argparse
+import subprocess
+import sys
+
+# Modules that are deferred until they're needed, and must not be imported eagerly.
+forbidden_modules = frozenset({
+    "asyncio",
+    "graphlib",
+    "immutables",
+    "injected._analysis",
+    "json",
+})
+
+
+# Parse the output of -X importtime, and return the cumulative time of importing the
+# package in microseconds, together with the names of all imported modules.
+def parse_importtime(output: str) -> tuple[int, frozenset[str]]:
+    cumulative = 0
+    modules = set[str]()
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, _, fields = line.partition(":")
+        _self, total, name = (field.strip() for field in fields.split("|"))
+        modules.add(name)
+        if name == "injected":
+            cumulative = int(total)
+    return cumulative, frozenset(modules)
+
+
+def measure() -> tuple[int, frozenset[str]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import injected"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    return parse_importtime(completed.stderr)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None)
+    options = parser.parse_args()
+
+    timings = []
+    modules = frozenset[str]()
+    for _ in range(options.repeat):
+        cumulative, modules = measure()
+        timings.append(cumulative)
+
+    best_ms = min(timings) / 1000
+    sys.stdout.write(f"import injected: {best_ms:.2f} ms (best of {options.repeat})\n")
+
+    failed = False
+    if imported := sorted(forbidden_modules & modules):
+        sys.stdout.write(f"eagerly imported: {', '.join(imported)}\n")
+        failed = True
+    if options.max_ms is not None and best_ms > options.max_ms:
+        sys.stdout.write(f"exceeds budget of {options.max_ms:.2f} ms\n")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Measure how resolving a graph of CPU-heavy sync providers scales with the number of
+worker threads. Scaling beyond a single core requires a free-threaded build of CPython.
+
+    python benchmarks/parallel_sync.py [--width 16] [--work 200000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from injected import depends
+from injected import depends_each
+from injected import resolver
+
+
+def get_seeds(width: int) -> range:
+    return range(width)
+
+
+def compute(seed: int, work: int) -> int:
+    total = seed
+    for value in range(work):
+        total = (total * 31 + value) % 1_000_003
+    return total
+
+
+def build_entrypoint(
+    width: int,
+    work: int,
+    executor: ThreadPoolExecutor | None,
+) -> Callable[[], int]:
+    def node(seed: int) -> int:
+        return compute(seed, work)
+
+    @resolver(executor=executor)
+    def entrypoint(
+        values: list[int] = depends_each(node, depends(get_seeds, width)),
+    ) -> int:
+        return sum(values)
+
+    return entrypoint
+
+
+def measure(width: int, work: int, workers: int | None, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        executor = None if workers is None else ThreadPoolExecutor(workers)
+        try:
+            entrypoint = build_entrypoint(width, work, executor)
+            start = time.perf_counter()
+            entrypoint()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--width", type=int, default=16)
+    parser.add_argument("--work", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    options = parser.parse_args()
+
+    gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+    cpu_count = os.cpu_count() or 1
+    out = sys.stdout
+    out.write(f"python {sys.version.split()[0]}, gil enabled: {gil_enabled}\n")
+
+    baseline = measure(options.width, options.work, None, options.repeat)
+    out.write(f"{'loop thread':>12}: {baseline:8.3f}s\n")
+    workers = 1
+    while workers <= cpu_count:
+        elapsed = measure(options.width, options.work, workers, options.repeat)
+        out.write(
+            f"{workers:>4} workers: {elapsed:8.3f}s  speedup {baseline / elapsed:5.2f}x\n"
+        )
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main()
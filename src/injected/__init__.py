@@ -1,13 +1,49 @@
+from typing import TYPE_CHECKING
+
+from ._base import Scope
 from ._base import depends
+from ._base import depends_each
 from ._base import resolver
 from ._base import seed_context
 from ._version import __version__
 from ._version import __version_tuple__
 
+# Graph analysis is only needed for tooling, so it's loaded on first access to keep
+# importing the package cheap.
+if TYPE_CHECKING:
+    from ._analysis import CriticalPath
+    from ._analysis import DependencyGraph
+    from ._analysis import GraphNode
+    from ._analysis import ProviderKind
+    from ._analysis import inspect_graph
+
 __all__ = (
+    "CriticalPath",
+    "DependencyGraph",
+    "GraphNode",
+    "ProviderKind",
+    "Scope",
     "__version__",
     "__version_tuple__",
     "depends",
+    "depends_each",
+    "inspect_graph",
     "resolver",
     "seed_context",
 )
+
+_analysis_names = frozenset({
+    "CriticalPath",
+    "DependencyGraph",
+    "GraphNode",
+    "ProviderKind",
+    "inspect_graph",
+})
+
+
+def __getattr__(name: str) -> object:
+    if name in _analysis_names:
+        from . import _analysis
+
+        return getattr(_analysis, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
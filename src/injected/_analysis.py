@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import enum
+import inspect
+import json
+from collections import Counter
+from collections import defaultdict
+from collections.abc import Callable
+from collections.abc import Mapping
+from collections.abc import Set
+from contextlib import AbstractAsyncContextManager
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from functools import partial
+from graphlib import TopologicalSorter
+from typing import Any
+from typing import final
+
+from ._base import Context
+from ._base import Fanout
+from ._base import FrozenMap
+from ._base import Request
+from ._base import build_graph
+from ._base import get_resolved_function
+
+
+@enum.unique
+class ProviderKind(enum.Enum):
+    sync = "sync"
+    async_ = "async"
+    context_manager = "context_manager"
+    async_context_manager = "async_context_manager"
+    async_generator = "async_generator"
+    fanout = "fanout"
+
+
+# Determine how a provider will be executed, without calling it. Context managers are
+# recognized by the generator functions they wrap, as produced by the decorators in
+# contextlib, and by classes implementing the context manager protocols. Functions that
+# return context managers otherwise can't be told apart from sync providers.
+def get_provider_kind(provider: Callable[..., object]) -> ProviderKind:
+    if isinstance(provider, Fanout):
+        return ProviderKind.fanout
+    if inspect.iscoroutinefunction(provider):
+        return ProviderKind.async_
+    if inspect.isasyncgenfunction(provider):
+        return ProviderKind.async_generator
+    if inspect.isclass(provider):
+        if issubclass(provider, AbstractAsyncContextManager):
+            return ProviderKind.async_context_manager
+        if issubclass(provider, AbstractContextManager):
+            return ProviderKind.context_manager
+        return ProviderKind.sync
+    unwrapped = inspect.unwrap(provider)
+    if unwrapped is not provider and inspect.isasyncgenfunction(unwrapped):
+        return ProviderKind.async_context_manager
+    if unwrapped is not provider and inspect.isgeneratorfunction(unwrapped):
+        return ProviderKind.context_manager
+    return ProviderKind.sync
+
+
+def get_provider_name(provider: Callable[..., object]) -> str:
+    if isinstance(provider, Fanout):
+        return f"depends_each({get_provider_name(provider.provider)})"
+    module = getattr(provider, "__module__", None)
+    name = getattr(provider, "__qualname__", None) or repr(provider)
+    return f"{module}.{name}" if module else name
+
+
+@final
+@dataclass(frozen=True, slots=True, kw_only=True)
+class GraphNode:
+    request: Request
+    # Kinds are inferred statically, and may thus differ from how a provider that
+    # returns a context manager is executed.
+    kind: ProviderKind
+    dependencies: Set[Request]
+    # The length of the longest chain of dependencies below the node, such that nodes
+    # without dependencies are at level 0.
+    level: int
+
+    @property
+    def name(self) -> str:
+        return get_provider_name(self.request.provider)
+
+
+@final
+@dataclass(frozen=True, slots=True, kw_only=True)
+class CriticalPath:
+    duration: float
+    requests: tuple[Request, ...]
+
+
+@final
+@dataclass(frozen=True, slots=True, kw_only=True)
+class DependencyGraph:
+    root: Request
+    # Nodes in topological order, such that dependencies precede their dependents.
+    nodes: Mapping[Request, GraphNode]
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def depth(self) -> int:
+        return self.nodes[self.root].level + 1
+
+    @property
+    def widths(self) -> tuple[int, ...]:
+        levels = Counter(node.level for node in self.nodes.values())
+        return tuple(levels[level] for level in range(self.depth))
+
+    @property
+    def parallelism(self) -> float:
+        # Average parallelism, as total work over span, assuming unit cost per node.
+        return self.node_count / self.depth
+
+    @property
+    def duplicated_providers(
+        self,
+    ) -> Mapping[Callable[..., object], tuple[Request, ...]]:
+        requests = defaultdict[Callable[..., object], list[Request]](list)
+        for request in self.nodes:
+            requests[request.provider].append(request)
+        return {
+            provider: tuple(provider_requests)
+            for provider, provider_requests in requests.items()
+            if len(provider_requests) > 1
+        }
+
+    def critical_path(
+        self,
+        timings: Mapping[Request | Callable[..., object], float],
+    ) -> CriticalPath:
+        # Timings are looked up by request first, and then by provider. Nodes without
+        # recorded timings are assumed to be free.
+        finish: dict[Request, tuple[float, Request | None]] = {}
+        for request, node in self.nodes.items():
+            duration = timings.get(request, timings.get(request.provider, 0.0))
+            start, predecessor = max(
+                (
+                    (finish[dependency][0], dependency)
+                    for dependency in node.dependencies
+                ),
+                default=(0.0, None),
+                key=lambda item: item[0],
+            )
+            finish[request] = (start + duration, predecessor)
+
+        path = []
+        current: Request | None = self.root
+        while current is not None:
+            path.append(current)
+            current = finish[current][1]
+        return CriticalPath(
+            duration=finish[self.root][0],
+            requests=tuple(reversed(path)),
+        )
+
+    def to_dict(self) -> dict[str, object]:
+        ids = {request: index for index, request in enumerate(self.nodes)}
+        return {
+            "root": ids[self.root],
+            "nodes": [
+                {
+                    "id": ids[request],
+                    "provider": node.name,
+                    "kind": node.kind.value,
+                    "args": [repr(arg) for arg in request.args],
+                    "kwargs": {
+                        name: repr(value) for name, value in request.kwargs.items()
+                    },
+                    "level": node.level,
+                    "dependencies": sorted(
+                        ids[dependency] for dependency in node.dependencies
+                    ),
+                }
+                for request, node in self.nodes.items()
+            ],
+        }
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_dot(self) -> str:
+        ids = {request: index for index, request in enumerate(self.nodes)}
+        lines = ["digraph {"]
+        for request, node in self.nodes.items():
+            label = json.dumps(f"{node.name}\n{node.kind.value}")
+            lines.append(f"  n{ids[request]} [label={label}];")
+        for request, node in self.nodes.items():
+            lines.extend(
+                f"  n{ids[dependency]} -> n{ids[request]};"
+                for dependency in sorted(node.dependencies, key=ids.__getitem__)
+            )
+        lines.append("}")
+        return "\n".join(lines)
+
+
+def inspect_graph(
+    fn: Callable[..., object],
+    *,
+    args: tuple[object, ...] = (),
+    kwargs: Mapping[str, object] = FrozenMap(),
+    seed: Context = FrozenMap(),
+) -> DependencyGraph:
+    # Accept seeded resolvers, resolvers, as well as undecorated functions.
+    if isinstance(fn, partial):
+        seed = {**seed, **fn.keywords.get("__seed_context__", {})}
+        fn = fn.func
+    fn = get_resolved_function(fn)
+
+    root = Request(provider=fn, args=args, kwargs=FrozenMap(kwargs))
+    seeded = {
+        Request(provider=provider, args=(), kwargs=FrozenMap()) for provider in seed
+    }
+    graph = build_graph(root, seeded)
+
+    nodes: dict[Request, GraphNode] = {}
+    for request in TopologicalSorter(graph).static_order():
+        dependencies = graph[request]
+        nodes[request] = GraphNode(
+            request=request,
+            kind=get_provider_kind(request.provider),
+            dependencies=dependencies,
+            level=max(
+                (nodes[dependency].level + 1 for dependency in dependencies),
+                default=0,
+            ),
+        )
+    return DependencyGraph(root=root, nodes=nodes)
@@ -1,34 +1,86 @@
 from __future__ import annotations
 
-import asyncio
 import inspect
+from collections import deque
+from collections.abc import AsyncGenerator
+from collections.abc import AsyncIterator
 from collections.abc import Awaitable
 from collections.abc import Callable
 from collections.abc import Container
+from collections.abc import Coroutine
+from collections.abc import Iterable
+from collections.abc import Iterator
 from collections.abc import Mapping
 from collections.abc import Set
 from contextlib import AbstractAsyncContextManager
 from contextlib import AbstractContextManager
 from contextlib import AsyncExitStack
+from contextlib import ExitStack
+from contextlib import aclosing
+from contextlib import suppress
+from contextvars import ContextVar
+from contextvars import Token
 from dataclasses import dataclass
 from functools import cache
 from functools import partial
 from functools import wraps
-from graphlib import TopologicalSorter
+from threading import Lock
+from types import TracebackType
+from typing import TYPE_CHECKING
 from typing import Any
 from typing import Final
 from typing import Generic
 from typing import NoReturn
+from typing import Self
 from typing import cast
 from typing import final
 from typing import overload
-
-from immutables import Map
+from weakref import WeakKeyDictionary
 
 # Needed for passing `default` argument.
 from typing_extensions import ParamSpec  # noqa: UP035
 from typing_extensions import TypeVar  # noqa: UP035
 
+# Importing asyncio is costly, so it's deferred until an event loop is needed, and is
+# avoided altogether when resolving graphs of only sync dependencies.
+if TYPE_CHECKING:
+    import asyncio
+    from concurrent.futures import Executor
+
+
+# A minimal immutable and hashable mapping, used to hold keyword arguments of requests.
+@final
+class FrozenMap[K, V](Mapping[K, V]):
+    __slots__ = ("_data", "_hash")
+
+    def __init__(self, data: Mapping[K, V] | None = None, /) -> None:
+        self._data: Final[dict[K, V]] = {} if data is None else dict(data)
+        self._hash: int | None = None
+
+    def __getitem__(self, key: K) -> V:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[K]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._data.items()))
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenMap):
+            return self._data == other._data
+        if isinstance(other, Mapping):
+            return self._data == dict(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._data!r})"
+
 
 @final
 @dataclass(frozen=True, slots=True, kw_only=True)
@@ -55,7 +107,36 @@ R = TypeVar("R", default=Any)
 class Request(Generic[P, R]):
     provider: Callable[P, R]
     args: tuple[object, ...]
-    kwargs: Map[str, object]
+    kwargs: FrozenMap[str, object]
+
+
+# Holds an argument that cannot be hashed, so that requests holding it can still be
+# hashed. Such requests are only equal to themselves, and are thus never shared.
+@final
+@dataclass(frozen=True, slots=True, eq=False)
+class Opaque:
+    value: object
+
+
+# Markers cannot be compared, so nested dependencies are held by their requests in the
+# arguments of requests, and arguments that cannot be hashed are held opaquely. Both are
+# turned back as the arguments of a request are bound.
+def to_argument(value: object) -> object:
+    if isinstance(value, Marker):
+        return value.request
+    try:
+        hash(value)
+    except TypeError:
+        return Opaque(value)
+    return value
+
+
+def from_argument(value: object) -> object:
+    if isinstance(value, Request):
+        return Marker(request=value)
+    if isinstance(value, Opaque):
+        return value.value
+    return value
 
 
 # We intentionally "lie" in the return type here, for a good reason. The returned value
@@ -97,31 +178,108 @@ def depends[T, **P](
     marker = Marker(
         request=Request(
             provider=provider,
-            args=tuple(args),
-            kwargs=Map(kwargs),
+            args=tuple(to_argument(arg) for arg in args),
+            kwargs=FrozenMap({
+                name: to_argument(value) for name, value in kwargs.items()
+            }),
         )
     )
     return cast(T, marker)
 
 
+@final
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Fanout:
+    provider: Callable[[Any], object]
+    limit: int | None
+
+    # Calling the fan-out only materializes the upstream collection, element requests
+    # are added to the graph by the scheduler as the fan-out node is executed.
+    def __call__(self, over: Iterable[object]) -> tuple[object, ...]:
+        return tuple(over)
+
+
+@overload
+def depends_each[T, E](
+    provider: Callable[[E], Awaitable[T]],
+    over: Iterable[E],
+    *,
+    limit: int | None = None,
+) -> list[T]: ...
+@overload
+def depends_each[T, E](
+    provider: Callable[[E], AbstractContextManager[T]],
+    over: Iterable[E],
+    *,
+    limit: int | None = None,
+) -> list[T]: ...
+@overload
+def depends_each[T, E](
+    provider: Callable[[E], AbstractAsyncContextManager[T]],
+    over: Iterable[E],
+    *,
+    limit: int | None = None,
+) -> list[T]: ...
+@overload
+def depends_each[T, E](
+    provider: Callable[[E], T],
+    over: Iterable[E],
+    *,
+    limit: int | None = None,
+) -> list[T]: ...
+# The collection is typed as an iterable in the overloads, but is a marker when it's
+# resolved as a dependency itself.
+def depends_each(
+    provider: Callable[[Any], object],
+    over: Iterable[Any] | Marker[..., Any],
+    *,
+    limit: int | None = None,
+) -> list[Any]:
+    if limit is not None and limit < 1:
+        raise ValueError("Fan-out limit must be a positive integer.")
+    marker = Marker(
+        request=Request(
+            provider=Fanout(provider=provider, limit=limit),
+            args=(to_argument(over if isinstance(over, Marker) else tuple(over)),),
+            kwargs=FrozenMap(),
+        )
+    )
+    return cast(list[Any], marker)
+
+
+# The cache of functools is thread-safe, including on free-threaded builds. Concurrent
+# misses may compute a signature more than once, which is harmless.
 @cache
 def get_signature(fn: Callable[..., object]) -> inspect.Signature:
     return inspect.signature(fn)
 
 
+def bind_request(request: Request) -> inspect.BoundArguments:
+    signature = get_signature(request.provider)
+    bound_arguments = signature.bind_partial(
+        *(from_argument(arg) for arg in request.args),
+        **{name: from_argument(value) for name, value in request.kwargs.items()},
+    )
+    bound_arguments.apply_defaults()
+    return bound_arguments
+
+
 type Graph = Mapping[Request, Set[Request]]
 
 
+# Requests are inserted into the graph after their dependencies, and each request is
+# only visited once, also when shared by multiple dependents.
 def build_graph(
     request: Request,
     context: Container[Request],
+    graph: dict[Request, Set[Request]] | None = None,
 ) -> Graph:
-    signature = get_signature(request.provider)
+    if graph is None:
+        graph = {}
+
     # Bind args and kwargs so that we can omit modeling nodes that won't be needed.
-    bound_arguments = signature.bind_partial(*request.args, **request.kwargs)
-    bound_arguments.apply_defaults()
+    bound_arguments = bind_request(request)
 
-    graph = Map[Request, Set[Request]]().mutate()
     requests = frozenset({
         value.request
         for value in bound_arguments.arguments.values()
@@ -129,122 +287,693 @@ def build_graph(
         if value.request not in context
     })
     for nested_request in requests:
-        graph.update(build_graph(nested_request, context))
+        if nested_request not in graph:
+            build_graph(nested_request, context, graph)
 
-    graph.set(request, requests)
-    return graph.finish()
+    graph[request] = requests
+    return graph
 
 
 sentinel: Final = object()
 
 
-def execute_request[T](
-    request: Request[Any, T],
-    context: Map[Request, object],
-) -> T:
-    signature = get_signature(request.provider)
-    params = []
-    for parameter in signature.parameters.values():
-        if (
-            isinstance(parameter.default, Marker)
-            and (context_value := context.get(parameter.default.request, sentinel))
-            is not sentinel
-        ):
-            params.append(parameter.replace(default=context_value))
-            continue
+# An execution plan for a single request, with dependency arguments resolved to the
+# slots that their results are stored in.
+@final
+@dataclass(frozen=True, slots=True, kw_only=True)
+class Node:
+    request: Request
+    args: tuple[object, ...]
+    kwargs: Mapping[str, object]
+    positional_slots: tuple[tuple[int, int], ...]
+    keyword_slots: tuple[tuple[str, int], ...]
+    is_coroutine: bool
+    is_stream: bool
 
-        params.append(parameter)
 
-    signature = signature.replace(parameters=tuple(params))
-    bound_arguments = signature.bind(*request.args, **request.kwargs)
-    bound_arguments.apply_defaults()
-    return request.provider(*bound_arguments.args, **bound_arguments.kwargs)
+def build_node(
+    request: Request,
+    slots: Mapping[Request, int],
+) -> Node:
+    bound_arguments = bind_request(request)
+    args = bound_arguments.args
+    kwargs = bound_arguments.kwargs
+    return Node(
+        request=request,
+        args=args,
+        kwargs=kwargs,
+        positional_slots=tuple(
+            (index, slots[value.request])
+            for index, value in enumerate(args)
+            if isinstance(value, Marker)
+        ),
+        keyword_slots=tuple(
+            (name, slots[value.request])
+            for name, value in kwargs.items()
+            if isinstance(value, Marker)
+        ),
+        is_coroutine=inspect.iscoroutinefunction(request.provider),
+        is_stream=inspect.isasyncgenfunction(request.provider),
+    )
 
 
-async def resolve[T](
+def execute_node(node: Node, results: list[object]) -> object:
+    args = list(node.args)
+    for index, slot in node.positional_slots:
+        args[index] = results[slot]
+    kwargs = dict(node.kwargs)
+    for name, slot in node.keyword_slots:
+        kwargs[name] = results[slot]
+    return node.request.provider(*args, **kwargs)
+
+
+# The state of an expanded fan-out. Element requests that were added to the graph by the
+# fan-out are held back, and released as earlier elements complete, to bound the number
+# of elements that are in flight at once.
+@final
+@dataclass(slots=True, kw_only=True)
+class Gather:
+    elements: tuple[int, ...]
+    held: deque[int]
+    throttled: Set[int]
+
+
+@final
+class Scheduler:
+    # Every request is assigned a fixed slot as it is added to the graph, and the state
+    # of requests is kept in lists indexed by slot. Results are stored by slot as well,
+    # so that dependency arguments are read by index, rather than by hashing requests.
+    def __init__(
+        self,
+        context_stack: ExitStack | AsyncExitStack,
+        *,
+        eager: bool = False,
+        executor: Executor | None = None,
+        isolate_failures: bool = False,
+    ) -> None:
+        self.context_stack = context_stack
+        self.eager: Final = eager
+        self.executor: Final = executor
+        self.isolate_failures: Final = isolate_failures
+        self.slots: Final[dict[Request, int]] = {}
+        self.nodes: Final[list[Node | None]] = []
+        self.results: Final[list[object]] = []
+        self.waiting: Final[list[int]] = []
+        self.dependents: Final[list[list[int]]] = []
+        self.tasks: Final[list[asyncio.Future[object] | None]] = []
+        self.offloaded: Final[list[bool]] = []
+        self.gathers: Final[dict[int, Gather]] = {}
+        # A stream can only be consumed once, so each may only have a single dependent.
+        # Dependents of streams that are already consumed fail as they are executed.
+        self.consumers: Final[dict[int, int]] = {}
+        self.conflicting: Final[set[int]] = set()
+        # Futures of requests that are awaited individually, resolved as they complete.
+        self.waiters: Final[dict[int, asyncio.Future[object]]] = {}
+        self.failed: Final[set[int]] = set()
+        self.ready: Final[deque[int]] = deque()
+        self.completed: Final[deque[int]] = deque()
+        self.wakeup: asyncio.Event | None = None
+        # Work that requires an event loop, deferred while resolving synchronously.
+        self.deferred: Final[deque[int]] = deque()
+        self.deferred_results: Final[deque[tuple[int, Node, object]]] = deque()
+        self.unfinished = 0
+
+    def allocate(
+        self,
+        request: Request,
+        result: object = sentinel,
+        *,
+        register: bool = True,
+    ) -> int:
+        slot = len(self.results)
+        if register:
+            self.slots[request] = slot
+        self.nodes.append(None)
+        self.results.append(result)
+        self.waiting.append(0)
+        self.dependents.append([])
+        self.tasks.append(None)
+        self.offloaded.append(False)
+        return slot
+
+    def seed(self, context: Context) -> None:
+        for provider, value in context.items():
+            self.allocate(
+                Request(provider=provider, args=(), kwargs=FrozenMap()),
+                value,
+            )
+
+    # Detached requests are not registered by their slot, so that they are evaluated
+    # anew rather than shared when added again, while their dependencies are shared.
+    def add(
+        self,
+        request: Request,
+        *,
+        held: bool = False,
+        detached: bool = False,
+    ) -> int:
+        if not detached and (slot := self.slots.get(request)) is not None:
+            return slot
+
+        # Remember: a single provider can have multiple nodes in the graph, since it
+        # shall be called with different arguments as passed.
+        graph = build_graph(request, self.slots)
+        added = {
+            node_request: self.allocate(
+                node_request,
+                register=not detached or node_request != request,
+            )
+            for node_request in graph
+        }
+        self.unfinished += len(added)
+
+        # Dependencies are read from the built nodes rather than from the graph, as the
+        # graph omits requests that are already known, including pending ones.
+        streams = []
+        for node_request, slot in added.items():
+            node = self.nodes[slot] = build_node(node_request, self.slots)
+            self.link(slot, node)
+            if node.is_stream:
+                streams.append(node_request)
+
+        # Streams are single-pass, so they're only shared within the graph they're added
+        # with, and requests added later are given streams of their own.
+        for stream_request in streams:
+            self.slots.pop(stream_request, None)
+
+        slot = added[request]
+        if held:
+            self.waiting[slot] += 1
+        for node_slot in added.values():
+            if not self.waiting[node_slot]:
+                self.ready.append(node_slot)
+        return slot
+
+    def link(self, slot: int, node: Node) -> None:
+        for dependency_slot in {
+            dependency_slot
+            for _, dependency_slot in (*node.positional_slots, *node.keyword_slots)
+        }:
+            if self.results[dependency_slot] is sentinel:
+                self.waiting[slot] += 1
+                self.dependents[dependency_slot].append(slot)
+            dependency = self.nodes[dependency_slot]
+            if (
+                dependency is not None
+                and dependency.is_stream
+                and self.consumers.setdefault(dependency_slot, slot) != slot
+            ):
+                self.conflicting.add(slot)
+
+    def release(self, slot: int, dependency: int) -> None:
+        self.waiting[slot] -= 1
+        if not self.waiting[slot]:
+            self.ready.append(slot)
+        if (
+            (gather := self.gathers.get(slot)) is not None
+            and dependency in gather.throttled
+            and gather.held
+        ):
+            self.release(gather.held.popleft(), slot)
+
+    def complete(self, slot: int, result: object) -> None:
+        self.results[slot] = result
+        self.unfinished -= 1
+        for dependent in self.dependents[slot]:
+            self.release(dependent, slot)
+        if (waiter := self.waiters.pop(slot, None)) is not None and not waiter.done():
+            waiter.set_result(result)
+
+    # With failures isolated, a failure is only propagated to the requests depending on
+    # the failed request, which fail along with it, while independent requests are
+    # still resolved. Failed requests are forgotten, so that they're retried when
+    # requested again.
+    def fail(self, slot: int, exception: Exception) -> None:
+        failing = [slot]
+        while failing:
+            slot = failing.pop()
+            if slot in self.failed:
+                continue
+            self.failed.add(slot)
+            self.unfinished -= 1
+            node = self.nodes[slot]
+            if node is not None and self.slots.get(node.request) == slot:
+                del self.slots[node.request]
+            if (
+                waiter := self.waiters.pop(slot, None)
+            ) is not None and not waiter.done():
+                waiter.set_exception(exception)
+            failing.extend(self.dependents[slot])
+
+    def schedule(self, slot: int, coroutine: Coroutine[Any, Any, object]) -> None:
+        import asyncio
+
+        if not self.eager:
+            task = asyncio.create_task(coroutine)
+        # An eagerly started task runs synchronously up until its first suspension, so
+        # coroutines that never suspend are already done when the task is returned, and
+        # can be completed right away.
+        elif (
+            task := asyncio.Task(
+                coroutine,
+                loop=asyncio.get_running_loop(),
+                eager_start=True,
+            )
+        ).done():
+            self.complete(slot, task.result())
+            return
+        task.add_done_callback(partial(self.finish, slot))
+        self.tasks[slot] = task
+
+    # Calls sync providers on the executor. Handling of the result, such as entering
+    # context managers, is left to the loop thread, as the context is not thread-safe.
+    def offload(self, slot: int, node: Node) -> None:
+        import asyncio
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, execute_node, node, self.results
+        )
+        future.add_done_callback(partial(self.finish, slot))
+        self.tasks[slot] = future
+        self.offloaded[slot] = True
+
+    def finish(self, slot: int, _task: asyncio.Future[object]) -> None:
+        assert self.wakeup is not None
+        self.completed.append(slot)
+        self.wakeup.set()
+
+    def expand(self, slot: int, fanout: Fanout, elements: tuple[object, ...]) -> None:
+        held = deque[int]()
+        element_slots = []
+        for element in elements:
+            request = Request(
+                provider=fanout.provider,
+                args=(to_argument(element),),
+                kwargs=FrozenMap(),
+            )
+            is_new = request not in self.slots
+            element_slots.append(self.add(request, held=is_new))
+            if is_new:
+                held.append(element_slots[-1])
+
+        gather = Gather(elements=tuple(element_slots), held=held, throttled=set(held))
+        self.gathers[slot] = gather
+        for element_slot in dict.fromkeys(element_slots):
+            if self.results[element_slot] is sentinel:
+                self.waiting[slot] += 1
+                self.dependents[element_slot].append(slot)
+        if not self.waiting[slot]:
+            self.ready.append(slot)
+
+        for _ in range(len(held) if fanout.limit is None else fanout.limit):
+            if not held:
+                break
+            self.release(held.popleft(), slot)
+
+    def execute(self, slot: int) -> None:
+        if (gather := self.gathers.pop(slot, None)) is not None:
+            self.complete(slot, [self.results[element] for element in gather.elements])
+            return
+
+        if slot in self.conflicting:
+            raise ValueError(
+                "Streaming dependencies cannot be shared by multiple dependents."
+            )
+
+        node = self.nodes[slot]
+        assert node is not None
+        if node.is_coroutine and not isinstance(self.context_stack, AsyncExitStack):
+            self.deferred.append(slot)
+        elif self.executor is not None and not node.is_coroutine:
+            self.offload(slot, node)
+        else:
+            self.handle(slot, node, execute_node(node, self.results))
+
+    def handle(self, slot: int, node: Node, result: object) -> None:
+        if isinstance(node.request.provider, Fanout):
+            self.expand(slot, node.request.provider, cast(tuple[object, ...], result))
+        elif node.is_coroutine or isinstance(
+            result, AbstractAsyncContextManager | AsyncGenerator
+        ):
+            if isinstance(self.context_stack, AsyncExitStack):
+                self.handle_async(slot, node, result, self.context_stack)
+            else:
+                self.deferred_results.append((slot, node, result))
+        elif isinstance(result, AbstractContextManager):
+            self.complete(slot, self.context_stack.enter_context(result))
+        else:
+            self.complete(slot, result)
+
+    def handle_async(
+        self,
+        slot: int,
+        node: Node,
+        result: object,
+        context_stack: AsyncExitStack,
+    ) -> None:
+        if node.is_coroutine:
+            self.schedule(slot, cast(Coroutine[Any, Any, object], result))
+        elif isinstance(result, AbstractAsyncContextManager):
+            self.schedule(slot, context_stack.enter_async_context(result))
+        else:
+            # Async generators are passed on to dependents as streams, and are
+            # finalized as the context is torn down.
+            context_stack.push_async_callback(
+                cast(AsyncGenerator[object], result).aclose
+            )
+            self.complete(slot, result)
+
+    def collect(self, slot: int) -> None:
+        task = self.tasks[slot]
+        assert task is not None
+        self.tasks[slot] = None
+        if self.offloaded[slot]:
+            node = self.nodes[slot]
+            assert node is not None
+            self.handle(slot, node, task.result())
+        else:
+            self.complete(slot, task.result())
+
+    def attempt(self, step: Callable[[int], None], slot: int) -> None:
+        try:
+            step(slot)
+        except Exception as exception:
+            if not self.isolate_failures:
+                raise
+            self.fail(slot, exception)
+
+    def run_sync(self) -> None:
+        while self.ready:
+            self.execute(self.ready.popleft())
+
+    async def run(self) -> None:
+        import asyncio
+
+        self.wakeup = asyncio.Event()
+        self.ready.extend(self.deferred)
+        self.deferred.clear()
+        while self.deferred_results:
+            self.handle(*self.deferred_results.popleft())
+
+        while self.unfinished:
+            while self.completed:
+                self.attempt(self.collect, self.completed.popleft())
+
+            # Requests that complete synchronously release their dependents right away,
+            # so these are executed within the same pass.
+            while self.ready:
+                self.attempt(self.execute, self.ready.popleft())
+
+            if self.unfinished and not self.completed:
+                await self.wakeup.wait()
+                self.wakeup.clear()
+
+
+async def resolve_within[T](
+    context_stack: AsyncExitStack,
     fn: Callable[..., T],
     seed: Context,
     args: tuple[object, ...],
-    kwargs: Map[str, object],
+    kwargs: FrozenMap[str, object],
+    eager: bool = False,
+    executor: Executor | None = None,
 ) -> T:
     request = Request(provider=fn, args=args, kwargs=kwargs)
-    context = Map({
-        Request(provider=provider, args=(), kwargs=Map()): value
-        for provider, value in seed.items()
-    })
+    scheduler = Scheduler(context_stack, eager=eager, executor=executor)
+    scheduler.seed(seed)
+    slot = scheduler.add(request)
+    await scheduler.run()
+    return cast(T, scheduler.results[slot])
+
 
-    # Remember: a single provider can have multiple nodes in the graph, since it shall
-    # be called with different arguments as passed.
-    graph = build_graph(request, context)
-    topological_sorter = TopologicalSorter(graph)
-    topological_sorter.prepare()
+async def resolve[T](
+    fn: Callable[..., T],
+    seed: Context,
+    args: tuple[object, ...],
+    kwargs: FrozenMap[str, object],
+    eager: bool = False,
+    executor: Executor | None = None,
+) -> T:
+    if (scope := current_scope.get()) is not None:
+        return await scope.resolve(fn, seed, args, kwargs)
+    async with AsyncExitStack() as context_stack:
+        result = await resolve_within(
+            context_stack, fn, seed, args, kwargs, eager, executor
+        )
+    return result
 
-    pending_requests: dict[asyncio.Task[object], Request] = {}
 
+async def resume(scheduler: Scheduler) -> None:
     async with AsyncExitStack() as context_stack:
-        while topological_sorter.is_active():
-            # important: query new requests _before_ creating the context mutation.
-            requests = tuple(topological_sorter.get_ready())
-            context_update = context.mutate()
-
-            for task, pending_request in tuple(pending_requests.items()):
-                if not task.done():
-                    continue
-                context_update.set(pending_request, task.result())
-                topological_sorter.done(pending_request)
-                del pending_requests[task]
-
-            for new_request in requests:
-                result = execute_request(new_request, context)
-                if inspect.iscoroutinefunction(new_request.provider):
-                    task = asyncio.create_task(result)
-                    pending_requests[task] = new_request
-                elif isinstance(result, AbstractAsyncContextManager):
-                    task = asyncio.create_task(
-                        context_stack.enter_async_context(result)
-                    )
-                    pending_requests[task] = new_request
-                else:
-                    if isinstance(result, AbstractContextManager):
-                        result = context_stack.enter_context(result)
-                    context_update.set(new_request, result)
-                    topological_sorter.done(new_request)
-
-            context = context_update.finish()
-            await asyncio.sleep(0)
-
-    return context[request]  # type: ignore[return-value]
+        scheduler.context_stack = context_stack
+        await scheduler.run()
+
+
+# Resolve sync dependencies without an event loop, and only start one once reaching
+# dependencies that require it. The context of sync dependencies resolved up until then
+# is torn down last, which is safe as they cannot depend on any async dependencies.
+def resolve_sync[T](
+    fn: Callable[..., T],
+    seed: Context,
+    args: tuple[object, ...],
+    kwargs: FrozenMap[str, object],
+    eager: bool = False,
+    executor: Executor | None = None,
+) -> T:
+    request = Request(provider=fn, args=args, kwargs=kwargs)
+    with ExitStack() as context_stack:
+        scheduler = Scheduler(context_stack, eager=eager, executor=executor)
+        scheduler.seed(seed)
+        slot = scheduler.add(request)
+        if executor is None:
+            scheduler.run_sync()
+        if scheduler.unfinished:
+            import asyncio
+
+            asyncio.run(resume(scheduler))
+    return cast(T, scheduler.results[slot])
+
+
+# Resolve an async generator entry-point, and yield its items while keeping the context
+# of its dependencies open, until iteration ends. Within a scope, the context is instead
+# kept open until the scope exits.
+async def stream[T](
+    fn: Callable[..., AsyncIterator[T]],
+    seed: Context,
+    args: tuple[object, ...],
+    kwargs: FrozenMap[str, object],
+    eager: bool = False,
+    executor: Executor | None = None,
+) -> AsyncGenerator[T]:
+    if (scope := current_scope.get()) is not None:
+        items = cast(AsyncGenerator[T], await scope.resolve(fn, seed, args, kwargs))
+        async with aclosing(items):
+            async for item in items:
+                yield item
+        return
+    async with AsyncExitStack() as context_stack:
+        iterator = await resolve_within(
+            context_stack, fn, seed, args, kwargs, eager, executor
+        )
+        async for item in iterator:
+            yield item
 
 
 type Context = Mapping[Callable[..., Any], object]
 
 
+# A scope shares resolved dependencies across all async resolver calls made within it,
+# such as the calls made while handling a single HTTP request. Each dependency is then
+# evaluated at most once per scope, and context managers are torn down as the scope
+# exits. Dependencies are resolved with the options of the scope, rather than those of
+# the individual resolvers.
+@final
+class Scope:
+    def __init__(
+        self,
+        context: Context = FrozenMap(),
+        *,
+        eager: bool = False,
+        executor: Executor | None = None,
+    ) -> None:
+        self.context_stack: Final = AsyncExitStack()
+        self.scheduler: Final = Scheduler(
+            self.context_stack,
+            eager=eager,
+            executor=executor,
+            isolate_failures=True,
+        )
+        self.scheduler.seed(context)
+        # A single task drives the scheduler on behalf of all concurrent calls.
+        self.driver: asyncio.Task[None] | None = None
+        self.token: Token[Scope | None] | None = None
+        self.exited = False
+
+    async def __aenter__(self) -> Self:
+        if self.token is not None:
+            raise RuntimeError("Scope cannot be entered more than once.")
+        await self.context_stack.__aenter__()
+        self.token = current_scope.set(self)
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool:
+        import asyncio
+
+        assert self.token is not None
+        current_scope.reset(self.token)
+        self.exited = True
+        if self.driver is not None and not self.driver.done():
+            self.driver.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.driver
+        return await self.context_stack.__aexit__(exc_type, exc_value, traceback)
+
+    async def resolve[T](
+        self,
+        fn: Callable[..., T],
+        seed: Context,
+        args: tuple[object, ...],
+        kwargs: FrozenMap[str, object],
+    ) -> T:
+        import asyncio
+
+        # Tasks started within the scope keep referring to it after it exits, but its
+        # context is torn down by then.
+        if self.exited:
+            raise RuntimeError("Scope cannot be used after it has exited.")
+        # Failures of providers are isolated by the scheduler, so the driver only fails
+        # unexpectedly, which leaves the state of the scope inconsistent.
+        if self.driver is not None and self.driver.done():
+            self.driver.result()
+
+        for provider, value in seed.items():
+            request = Request(provider=provider, args=(), kwargs=FrozenMap())
+            if (slot := self.scheduler.slots.get(request)) is None:
+                self.scheduler.allocate(request, value)
+            elif self.scheduler.results[slot] is not value:
+                raise ValueError(
+                    "Cannot seed a dependency that is already resolved within the "
+                    "scope."
+                )
+
+        # The entry-point is called anew on every call, only its dependencies are shared.
+        # Each call awaits only its own request, so that concurrent calls, including
+        # calls nested within the resolution of another, don't wait for one another.
+        slot = self.scheduler.add(
+            Request(provider=fn, args=args, kwargs=kwargs),
+            detached=True,
+        )
+        waiter = asyncio.get_running_loop().create_future()
+        self.scheduler.waiters[slot] = waiter
+        if self.driver is None or self.driver.done():
+            self.driver = asyncio.create_task(self.scheduler.run())
+            self.driver.add_done_callback(self.abort)
+        # A driver that has yet to start picks up the added requests as it does.
+        elif self.scheduler.wakeup is not None:
+            self.scheduler.wakeup.set()
+        return cast(T, await waiter)
+
+    # Fail the calls that are still pending once the driver stops short. Callbacks run
+    # soon after the driver is done, by when later calls may have started another.
+    def abort(self, driver: asyncio.Task[None]) -> None:
+        exception = None if driver.cancelled() else driver.exception()
+        if driver is not self.driver:
+            return
+        for waiter in self.scheduler.waiters.values():
+            if waiter.done():
+                continue
+            if exception is not None:
+                waiter.set_exception(exception)
+            else:
+                waiter.cancel()
+        self.scheduler.waiters.clear()
+
+
+current_scope: Final = ContextVar[Scope | None]("current_scope", default=None)
+
+# Maps resolvers to the functions they wrap, so that their graphs can be introspected.
+# Weak dictionaries are not safe for concurrent use, so access is guarded by a lock.
+resolved_functions: Final = WeakKeyDictionary[Callable[..., Any], Callable[..., Any]]()
+resolved_functions_lock: Final = Lock()
+
+
+def get_resolved_function(fn: Callable[..., Any]) -> Callable[..., Any]:
+    with resolved_functions_lock:
+        return resolved_functions.get(fn, fn)
+
+
 def seed_context[C: Callable[..., Any]](
     wrapper: C,
-    context: Context = Map(),
+    context: Context = FrozenMap(),
 ) -> C:
     return cast(C, partial(wrapper, __seed_context__=context))
 
 
-def resolver[C: Callable[..., Any]](fn: C) -> C:
-    if inspect.iscoroutinefunction(fn):
+@overload
+def resolver[C: Callable[..., Any]](fn: C, /) -> C: ...
+@overload
+def resolver[C: Callable[..., Any]](
+    *,
+    eager: bool = ...,
+    executor: Executor | None = ...,
+) -> Callable[[C], C]: ...
+def resolver[C: Callable[..., Any]](
+    fn: C | None = None,
+    /,
+    *,
+    eager: bool = False,
+    executor: Executor | None = None,
+) -> C | Callable[[C], C]:
+    if fn is None:
+        return cast(
+            Callable[[C], C],
+            partial(resolver, eager=eager, executor=executor),
+        )
+
+    if inspect.isasyncgenfunction(fn):
+
+        @wraps(fn)
+        async def wrapper(
+            *args: object,
+            __seed_context__: Context = FrozenMap(),
+            **kwargs: object,
+        ) -> AsyncIterator[object]:
+            items = stream(
+                fn, __seed_context__, args, FrozenMap(kwargs), eager, executor
+            )
+            async with aclosing(items):
+                async for item in items:
+                    yield item
+
+    elif inspect.iscoroutinefunction(fn):
 
         @wraps(fn)
         async def wrapper(
             *args: object,
-            __seed_context__: Context = Map(),
+            __seed_context__: Context = FrozenMap(),
             **kwargs: object,
         ) -> object:
-            return await resolve(fn, __seed_context__, args, Map(kwargs))
+            return await resolve(
+                fn, __seed_context__, args, FrozenMap(kwargs), eager, executor
+            )
 
     else:
 
         @wraps(fn)
         def wrapper(
             *args: object,
-            __seed_context__: Context = Map(),
+            __seed_context__: Context = FrozenMap(),
             **kwargs: object,
         ) -> object:
-            return asyncio.run(resolve(fn, __seed_context__, args, Map(kwargs)))
+            return resolve_sync(
+                fn, __seed_context__, args, FrozenMap(kwargs), eager, executor
+            )
 
+    with resolved_functions_lock:
+        resolved_functions[wrapper] = fn
     return cast(C, wrapper)
@@ -0,0 +1,195 @@
+import json
+from collections.abc import AsyncIterator
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import asynccontextmanager
+from contextlib import contextmanager
+
+from injected import ProviderKind
+from injected import depends
+from injected import depends_each
+from injected import inspect_graph
+from injected import resolver
+from injected import seed_context
+from injected._base import FrozenMap
+from injected._base import Request
+from injected._base import get_resolved_function
+
+
+def get_root() -> int:
+    return 1
+
+
+async def get_async(value: int = depends(get_root)) -> int:
+    return value
+
+
+@contextmanager
+def get_resource(value: int = depends(get_root)) -> Iterator[int]:
+    yield value
+
+
+@asynccontextmanager
+async def get_async_resource(value: int = depends(get_root)) -> AsyncIterator[int]:
+    yield value
+
+
+async def get_stream() -> AsyncIterator[int]:
+    yield 1
+
+
+def scale(value: int, factor: int = depends(get_root)) -> int:
+    return value * factor
+
+
+def get_values() -> list[int]:
+    return [1, 2]
+
+
+@resolver
+def entrypoint(
+    a: int = depends(get_async),
+    b: int = depends(get_resource),
+    c: int = depends(get_async_resource),
+    d: AsyncIterator[int] = depends(get_stream),
+    e: int = depends(scale, 2),
+    f: int = depends(scale, 3),
+    g: list[int] = depends_each(scale, depends(get_values)),
+) -> int:
+    return a
+
+
+def request(
+    provider: Callable[..., object], *args: object, **kwargs: object
+) -> Request:
+    return Request(provider=provider, args=args, kwargs=FrozenMap(kwargs))
+
+
+class TestInspectGraph:
+    def test_models_nodes_and_kinds_without_executing(self):
+        graph = inspect_graph(entrypoint)
+
+        assert graph.root == request(get_resolved_function(entrypoint))
+        assert graph.node_count == 10
+        kinds = {node.request.provider: node.kind for node in graph.nodes.values()}
+        assert kinds[get_root] is ProviderKind.sync
+        assert kinds[get_async] is ProviderKind.async_
+        assert kinds[get_resource] is ProviderKind.context_manager
+        assert kinds[get_async_resource] is ProviderKind.async_context_manager
+        assert kinds[get_stream] is ProviderKind.async_generator
+        assert kinds[scale] is ProviderKind.sync
+        assert {
+            node.kind
+            for node in graph.nodes.values()
+            if node.name == "depends_each(tests.test_analysis.scale)"
+        } == {ProviderKind.fanout}
+
+    def test_recognizes_context_manager_classes(self):
+        class Resource:
+            def __enter__(self) -> int:
+                return 1
+
+            def __exit__(self, *args: object) -> None:
+                pass
+
+        class AsyncResource:
+            async def __aenter__(self) -> int:
+                return 2
+
+            async def __aexit__(self, *args: object) -> None:
+                pass
+
+        class Plain:
+            pass
+
+        @resolver
+        def dependent(
+            a: int = depends(Resource),
+            b: int = depends(AsyncResource),
+            c: Plain = depends(Plain),
+        ) -> int:
+            return a + b
+
+        kinds = {
+            node.request.provider: node.kind
+            for node in inspect_graph(dependent).nodes.values()
+        }
+        assert kinds[Resource] is ProviderKind.context_manager
+        assert kinds[AsyncResource] is ProviderKind.async_context_manager
+        assert kinds[Plain] is ProviderKind.sync
+
+    def test_orders_nodes_topologically(self):
+        graph = inspect_graph(entrypoint)
+        seen: set[Request] = set()
+        for request, node in graph.nodes.items():
+            assert node.dependencies <= seen
+            seen.add(request)
+
+    def test_computes_static_metrics(self):
+        graph = inspect_graph(entrypoint)
+
+        assert graph.depth == 3
+        assert graph.widths == (3, 6, 1)
+        assert graph.parallelism == 10 / 3
+        assert {
+            provider: set(requests)
+            for provider, requests in graph.duplicated_providers.items()
+        } == {scale: {request(scale, 2), request(scale, 3)}}
+
+    def test_omits_seeded_and_passed_dependencies(self):
+        graph = inspect_graph(
+            seed_context(entrypoint, {get_root: 5}),
+            kwargs={"a": 1, "g": ()},
+        )
+        providers = {request.provider for request in graph.nodes}
+        assert providers == {
+            get_resolved_function(entrypoint),
+            get_resource,
+            get_async_resource,
+            get_stream,
+            scale,
+        }
+        assert graph.depth == 2
+
+    def test_estimates_critical_path(self):
+        graph = inspect_graph(entrypoint)
+        path = graph.critical_path({
+            get_root: 1.0,
+            get_async: 5.0,
+            get_resource: 2.0,
+            request(scale, 3): 7.0,
+        })
+        assert path.duration == 8.0
+        assert path.requests == (
+            request(get_root),
+            request(scale, 3),
+            graph.root,
+        )
+
+    def test_exports_json(self):
+        graph = inspect_graph(entrypoint)
+        exported = json.loads(graph.to_json())
+
+        assert exported["root"] == len(graph.nodes) - 1
+        assert len(exported["nodes"]) == 10
+        root = exported["nodes"][exported["root"]]
+        assert root["provider"] == "tests.test_analysis.entrypoint"
+        assert root["kind"] == "sync"
+        assert root["level"] == 2
+        assert len(root["dependencies"]) == 7
+        (scale_node,) = (
+            node
+            for node in exported["nodes"]
+            if node["provider"] == "tests.test_analysis.scale" and node["args"] == ["2"]
+        )
+        assert scale_node["kwargs"] == {}
+
+    def test_exports_dot(self):
+        graph = inspect_graph(entrypoint)
+        dot = graph.to_dot()
+
+        lines = dot.splitlines()
+        assert lines[0] == "digraph {"
+        assert lines[-1] == "}"
+        assert sum("->" in line for line in lines) == 13
+        assert '[label="tests.test_analysis.get_root\\nsync"];' in dot
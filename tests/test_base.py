@@ -1,8 +1,12 @@
 import asyncio
 import enum
+import threading
+from collections.abc import AsyncGenerator
 from collections.abc import AsyncIterator
+from collections.abc import Awaitable
 from collections.abc import Callable
 from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from contextlib import contextmanager
 from dataclasses import dataclass
@@ -11,11 +15,13 @@ from operator import ne
 from typing import Any
 
 import pytest
-from immutables import Map
 
+from injected import Scope
 from injected import depends
+from injected import depends_each
 from injected import resolver
 from injected import seed_context
+from injected._base import FrozenMap
 from injected._base import Marker
 from injected._base import Request
 
@@ -26,7 +32,7 @@ class TestMarker:
         self,
         operator: Callable[..., Any],
     ):
-        request = Request(provider=lambda: None, args=(), kwargs=Map())
+        request = Request(provider=lambda: None, args=(), kwargs=FrozenMap())
         marker = Marker(request=request)
         with pytest.raises(NotImplementedError):
             operator(marker, marker)
@@ -36,7 +42,7 @@ class TestMarker:
             operator("other", marker)
 
     def test_raises_not_implemented_error_when_cast_to_str(self):
-        request = Request(provider=lambda: None, args=(), kwargs=Map())
+        request = Request(provider=lambda: None, args=(), kwargs=FrozenMap())
         marker = Marker(request=request)
         with pytest.raises(NotImplementedError):
             str(marker)
@@ -157,6 +163,22 @@ class TestResolver:
 
         assert c() == (123, 321)
 
+    def test_can_resolve_positional_only_dependency(self):
+        def a(value: int) -> int:
+            return value
+
+        def b(provided: int = depends(a, 5), /, factor: int = 3) -> int:
+            return provided * factor
+
+        @resolver
+        def c(
+            positional: int = depends(b),
+            keyword: int = depends(a, value=7),
+        ) -> int:
+            return positional + keyword
+
+        assert c() == 5 * 3 + 7
+
     def test_reuses_resolved_value(self):
         count = 0
 
@@ -295,6 +317,63 @@ class TestResolver:
             ContextEvent.teardown,
         ]
 
+    def test_resolves_sync_dependencies_without_event_loop(self):
+        def running_loop() -> bool:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return False
+            return True
+
+        @resolver
+        def dependent(has_loop: bool = depends(running_loop)) -> bool:
+            return has_loop
+
+        assert dependent() is False
+
+    def test_tears_down_sync_context_after_async_context(self):
+        events: list[tuple[object, ContextEvent]] = []
+
+        @contextmanager
+        def sync_resource() -> Iterator[int]:
+            events.append((sync_resource, ContextEvent.setup))
+            yield 2
+            events.append((sync_resource, ContextEvent.teardown))
+
+        @asynccontextmanager
+        async def async_resource(
+            value: int = depends(sync_resource),
+        ) -> AsyncIterator[int]:
+            events.append((async_resource, ContextEvent.setup))
+            yield value * 3
+            events.append((async_resource, ContextEvent.teardown))
+
+        @resolver
+        def dependent(
+            a: int = depends(sync_resource),
+            b: int = depends(async_resource),
+        ) -> int:
+            return a * b
+
+        assert dependent() == 12
+        assert events == [
+            (sync_resource, ContextEvent.setup),
+            (async_resource, ContextEvent.setup),
+            (async_resource, ContextEvent.teardown),
+            (sync_resource, ContextEvent.teardown),
+        ]
+
+
+class TestFrozenMap:
+    def test_is_hashable_and_compares_by_items(self):
+        first = FrozenMap({"a": 1, "b": 2})
+        second = FrozenMap({"b": 2, "a": 1})
+        assert first == second
+        assert hash(first) == hash(second)
+        assert first == {"a": 1, "b": 2}
+        assert first != FrozenMap({"a": 1})
+        assert len({first, second}) == 1
+
 
 class TestAsyncResolver:
     async def test_can_resolve_simple_dependency(self):
@@ -564,3 +643,676 @@ class TestAsyncResolver:
             ContextEvent.usage,
             ContextEvent.teardown,
         ]
+
+
+class TestEagerResolver:
+    async def test_completes_non_suspending_providers_without_yielding(self):
+        yielded = False
+
+        async def observe() -> None:
+            nonlocal yielded
+            yielded = True
+
+        async def a() -> int:
+            return 3
+
+        async def b(value: int = depends(a)) -> int:
+            return value * 5
+
+        @asynccontextmanager
+        async def c(value: int = depends(b)) -> AsyncIterator[int]:
+            yield value * 7
+
+        @resolver(eager=True)
+        async def dependent(value: int = depends(c)) -> int:
+            return value
+
+        observer = asyncio.create_task(observe())
+        assert await dependent() == 3 * 5 * 7
+        assert not yielded
+        await observer
+
+    async def test_can_resolve_suspending_dependencies(self):
+        async def provider(arg: int) -> int:
+            await asyncio.sleep(arg * 0.01)
+            return arg
+
+        async def cached(arg: int) -> int:
+            return arg
+
+        async def intermediate(
+            slow: int = depends(provider, arg=3),
+            fast: int = depends(cached, arg=5),
+        ) -> int:
+            return slow * fast
+
+        @resolver(eager=True)
+        async def dependent(
+            a: int = depends(intermediate),
+            b: int = depends(provider, arg=7),
+        ) -> int:
+            return a * b
+
+        assert await dependent() == 3 * 5 * 7
+
+    def test_can_resolve_from_sync_entrypoint(self):
+        async def a() -> int:
+            return 11
+
+        @resolver(eager=True)
+        def dependent(value: int = depends(a)) -> int:
+            return value
+
+        assert dependent() == 11
+
+
+class TestFanout:
+    async def test_can_resolve_provider_for_each_element(self):
+        async def get_ids() -> list[int]:
+            return [3, 1, 2]
+
+        async def get_item(item_id: int) -> str:
+            await asyncio.sleep((3 - item_id) * 0.01)
+            return f"item-{item_id}"
+
+        def get_length(item_id: int) -> int:
+            return item_id * 10
+
+        @resolver
+        async def dependent(
+            items: list[str] = depends_each(get_item, depends(get_ids)),
+            lengths: list[int] = depends_each(get_length, depends(get_ids)),
+        ) -> tuple[list[str], list[int]]:
+            return items, lengths
+
+        assert await dependent() == (
+            ["item-3", "item-1", "item-2"],
+            [30, 10, 20],
+        )
+
+    def test_can_resolve_empty_collection(self):
+        def get_ids() -> tuple[int, ...]:
+            return ()
+
+        def get_item(item_id: int) -> int:
+            raise NotImplementedError
+
+        @resolver
+        def dependent(items: list[int] = depends_each(get_item, depends(get_ids))):
+            return items
+
+        assert dependent() == []
+
+    async def test_deduplicates_element_requests(self):
+        calls = []
+
+        def get_ids() -> list[int]:
+            return [1, 2, 1, 3]
+
+        async def get_item(item_id: int) -> int:
+            calls.append(item_id)
+            return item_id * 2
+
+        @resolver
+        async def dependent(
+            items: list[int] = depends_each(get_item, depends(get_ids)),
+            single: int = depends(get_item, 3),
+        ) -> tuple[list[int], int]:
+            return items, single
+
+        assert await dependent() == ([2, 4, 2, 6], 6)
+        assert sorted(calls) == [1, 2, 3]
+
+    def test_deduplicates_identical_fanouts(self):
+        calls = []
+
+        def get_ids() -> list[int]:
+            return [1, 2]
+
+        def get_item(item_id: int) -> int:
+            calls.append(item_id)
+            return item_id * 2
+
+        def first(items: list[int] = depends_each(get_item, depends(get_ids))) -> int:
+            return sum(items)
+
+        def second(items: list[int] = depends_each(get_item, depends(get_ids))) -> int:
+            return len(items)
+
+        @resolver
+        def dependent(
+            a: int = depends(first),
+            b: int = depends(second),
+        ) -> tuple[int, int]:
+            return a, b
+
+        assert dependent() == (6, 2)
+        assert sorted(calls) == [1, 2]
+
+    def test_can_fan_out_over_unhashable_elements(self):
+        def get_rows() -> list[dict[str, int]]:
+            return [{"id": 1}, {"id": 2}, {"id": 1}]
+
+        def get_item(row: dict[str, int]) -> int:
+            return row["id"] * 2
+
+        @resolver
+        def dependent(
+            items: list[int] = depends_each(get_item, depends(get_rows)),
+        ) -> list[int]:
+            return items
+
+        assert dependent() == [2, 4, 2]
+
+    def test_can_fan_out_over_literal_collection(self):
+        def get_item(item_id: int) -> int:
+            return item_id * 2
+
+        def get_key(row: dict[str, int]) -> int:
+            return row["id"]
+
+        @resolver
+        def dependent(
+            items: list[int] = depends_each(get_item, [1, 2]),
+            keys: list[int] = depends_each(get_key, [{"id": 3}, {"id": 4}]),
+        ) -> tuple[list[int], list[int]]:
+            return items, keys
+
+        assert dependent() == ([2, 4], [3, 4])
+
+    async def test_bounds_concurrently_running_elements(self):
+        running = 0
+        max_running = 0
+
+        def get_ids() -> range:
+            return range(10)
+
+        async def get_item(item_id: int) -> int:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return item_id
+
+        @resolver
+        async def dependent(
+            items: list[int] = depends_each(get_item, depends(get_ids), limit=3),
+        ) -> list[int]:
+            return items
+
+        assert await dependent() == list(range(10))
+        assert max_running == 3
+
+    async def test_resolves_nested_dependencies_of_elements(self):
+        events = []
+
+        @asynccontextmanager
+        async def get_connection() -> AsyncIterator[str]:
+            events.append(ContextEvent.setup)
+            yield "connection"
+            events.append(ContextEvent.teardown)
+
+        def get_ids() -> list[int]:
+            return [1, 2]
+
+        def get_item(
+            item_id: int,
+            connection: str = depends(get_connection),
+        ) -> str:
+            events.append(ContextEvent.usage)
+            return f"{connection}-{item_id}"
+
+        @resolver
+        async def dependent(
+            items: list[str] = depends_each(get_item, depends(get_ids)),
+        ) -> list[str]:
+            return items
+
+        assert await dependent() == ["connection-1", "connection-2"]
+        assert events == [
+            ContextEvent.setup,
+            ContextEvent.usage,
+            ContextEvent.usage,
+            ContextEvent.teardown,
+        ]
+
+    @pytest.mark.parametrize("limit", (0, -1))
+    def test_raises_value_error_for_non_positive_limit(self, limit: int):
+        with pytest.raises(ValueError, match=r"^Fan-out limit must be"):
+            depends_each(str, [], limit=limit)
+
+
+class TestStreaming:
+    async def test_can_depend_on_async_generator(self):
+        events = []
+
+        async def numbers() -> AsyncGenerator[int]:
+            try:
+                for number in range(100):
+                    events.append(ContextEvent.dependency)
+                    yield number
+            finally:
+                events.append(ContextEvent.teardown)
+
+        @resolver
+        async def dependent(
+            stream: AsyncIterator[int] = depends(numbers),
+        ) -> list[int]:
+            consumed = []
+            async for number in stream:
+                consumed.append(number)
+                if number == 2:
+                    break
+            events.append(ContextEvent.usage)
+            return consumed
+
+        assert await dependent() == [0, 1, 2]
+        assert events == [
+            ContextEvent.dependency,
+            ContextEvent.dependency,
+            ContextEvent.dependency,
+            ContextEvent.usage,
+            ContextEvent.teardown,
+        ]
+
+    async def test_raises_value_error_for_stream_with_multiple_dependents(self):
+        async def numbers() -> AsyncGenerator[int]:
+            for number in range(4):
+                yield number
+
+        async def collect(stream: AsyncIterator[int] = depends(numbers)) -> list[int]:
+            return [number async for number in stream]
+
+        async def count(stream: AsyncIterator[int] = depends(numbers)) -> int:
+            return len([number async for number in stream])
+
+        @resolver
+        async def dependent(
+            collected: list[int] = depends(collect),
+            counted: int = depends(count),
+        ) -> tuple[list[int], int]:
+            return collected, counted
+
+        with pytest.raises(ValueError, match="multiple dependents"):
+            await dependent()
+
+    async def test_can_resolve_async_generator_entrypoint(self):
+        events = []
+
+        @asynccontextmanager
+        async def resource() -> AsyncIterator[int]:
+            events.append(ContextEvent.setup)
+            yield 3
+            events.append(ContextEvent.teardown)
+
+        @resolver
+        async def dependent(
+            factor: int = depends(resource),
+        ) -> AsyncIterator[int]:
+            for number in range(3):
+                events.append(ContextEvent.usage)
+                yield number * factor
+
+        items = []
+        async for item in dependent():
+            assert events[-1] is ContextEvent.usage
+            items.append(item)
+
+        assert items == [0, 3, 6]
+        assert events == [
+            ContextEvent.setup,
+            ContextEvent.usage,
+            ContextEvent.usage,
+            ContextEvent.usage,
+            ContextEvent.teardown,
+        ]
+
+    async def test_tears_down_context_when_entrypoint_is_closed_early(self):
+        events = []
+
+        @asynccontextmanager
+        async def resource() -> AsyncIterator[int]:
+            events.append(ContextEvent.setup)
+            try:
+                yield 1
+            finally:
+                events.append(ContextEvent.teardown)
+
+        @resolver
+        async def dependent(
+            value: int = depends(resource),
+        ) -> AsyncGenerator[int]:
+            while True:
+                yield value
+
+        items = dependent()
+        assert await anext(items) == 1
+        assert events == [ContextEvent.setup]
+        await items.aclose()
+        assert events == [ContextEvent.setup, ContextEvent.teardown]
+
+
+class TestThreadedResolver:
+    def test_runs_sync_providers_on_executor(self):
+        events = []
+        loop_thread = threading.get_ident()
+
+        def a() -> int:
+            return threading.get_ident()
+
+        @contextmanager
+        def resource(thread: int = depends(a)) -> Iterator[int]:
+            events.append(ContextEvent.setup)
+            yield thread
+            events.append(ContextEvent.teardown)
+
+        async def b(thread: int = depends(resource)) -> tuple[int, int]:
+            return thread, threading.get_ident()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+
+            @resolver(executor=executor)
+            def dependent(
+                threads: tuple[int, int] = depends(b),
+            ) -> tuple[int, int]:
+                return threads
+
+            provider_thread, async_thread = dependent()
+
+        assert provider_thread != loop_thread
+        assert async_thread == loop_thread
+        assert events == [ContextEvent.setup, ContextEvent.teardown]
+
+    async def test_runs_independent_sync_providers_in_parallel(self):
+        # Each provider waits for the other at the barrier, so this only completes when
+        # both run at the same time.
+        barrier = threading.Barrier(2, timeout=5)
+
+        def provider(arg: int) -> int:
+            barrier.wait()
+            return arg
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+
+            @resolver(executor=executor)
+            async def dependent(
+                a: int = depends(provider, arg=3),
+                b: int = depends(provider, arg=5),
+            ) -> int:
+                return a * b
+
+            assert await dependent() == 3 * 5
+
+    async def test_can_fan_out_on_executor(self):
+        def get_ids() -> list[int]:
+            return [1, 2, 3]
+
+        def get_item(item_id: int) -> int:
+            return item_id * 2
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+
+            @resolver(executor=executor)
+            async def dependent(
+                items: list[int] = depends_each(get_item, depends(get_ids), limit=2),
+            ) -> list[int]:
+                return items
+
+            assert await dependent() == [2, 4, 6]
+
+
+class TestScope:
+    async def test_shares_dependencies_across_calls(self):
+        events = []
+
+        async def get_user() -> str:
+            events.append(ContextEvent.dependency)
+            return "user"
+
+        @asynccontextmanager
+        async def get_session() -> AsyncIterator[int]:
+            events.append(ContextEvent.setup)
+            yield 7
+            events.append(ContextEvent.teardown)
+
+        @resolver
+        async def first(
+            user: str = depends(get_user),
+            session: int = depends(get_session),
+        ) -> str:
+            events.append(ContextEvent.usage)
+            return f"{user}-{session}"
+
+        @resolver
+        async def second(session: int = depends(get_session)) -> int:
+            events.append(ContextEvent.usage)
+            return session * 3
+
+        async with Scope():
+            assert await first() == "user-7"
+            assert await second() == 21
+            assert await first() == "user-7"
+            # The order of independent dependencies is unspecified.
+            assert set(events[:2]) == {ContextEvent.dependency, ContextEvent.setup}
+            assert events[2:] == [ContextEvent.usage] * 3
+
+        assert events[-1] is ContextEvent.teardown
+        assert events.count(ContextEvent.teardown) == 1
+
+    async def test_shares_dependencies_across_concurrent_calls(self):
+        calls = 0
+
+        async def provider() -> int:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 5
+
+        @resolver
+        async def dependent(value: int = depends(provider), factor: int = 1) -> int:
+            await asyncio.sleep(0)
+            return value * factor
+
+        async with Scope():
+            results = await asyncio.gather(
+                dependent(factor=2),
+                dependent(factor=3),
+                dependent(factor=2),
+            )
+        assert list(results) == [10, 15, 10]
+        assert calls == 1
+
+    async def test_does_not_wait_for_unrelated_concurrent_calls(self):
+        returned = []
+
+        async def get_slow() -> int:
+            await asyncio.sleep(0.2)
+            return 1
+
+        @resolver
+        async def slow(value: int = depends(get_slow)) -> int:
+            return value
+
+        @resolver
+        async def fast() -> int:
+            return 2
+
+        async def call(fn: Callable[[], Awaitable[int]]) -> int:
+            value = await fn()
+            returned.append(fn)
+            return value
+
+        async with Scope():
+            results = await asyncio.gather(call(slow), call(fast))
+        assert list(results) == [1, 2]
+        assert returned == [fast, slow]
+
+    async def test_can_nest_resolvers(self):
+        async def get_value() -> int:
+            return 7
+
+        @resolver
+        async def inner(value: int = depends(get_value)) -> int:
+            return value * 3
+
+        @resolver
+        async def depending(value: int = depends(inner)) -> int:
+            return value
+
+        @resolver
+        async def awaiting(value: int = depends(get_value)) -> int:
+            return await inner() + value - 7
+
+        async with Scope():
+            assert await asyncio.wait_for(depending(), 1) == 21
+            assert await asyncio.wait_for(awaiting(), 1) == 21
+
+    async def test_propagates_errors_to_pending_calls(self):
+        async def failing() -> int:
+            await asyncio.sleep(0)
+            raise LookupError
+
+        @resolver
+        async def dependent(value: int = depends(failing)) -> int:
+            return value
+
+        with pytest.raises(LookupError):
+            async with Scope():
+                await asyncio.wait_for(asyncio.gather(dependent(), dependent()), 1)
+
+    async def test_isolates_failures_to_dependent_calls(self):
+        attempts = 0
+
+        async def failing() -> int:
+            nonlocal attempts
+            attempts += 1
+            await asyncio.sleep(0)
+            raise KeyError
+
+        async def get_value() -> int:
+            await asyncio.sleep(0.01)
+            return 3
+
+        @resolver
+        async def independent(value: int = depends(get_value)) -> int:
+            return value
+
+        @resolver
+        async def dependent(
+            value: int = depends(get_value),
+            failed: int = depends(failing),
+        ) -> int:
+            return value + failed
+
+        async with Scope():
+            first, second = await asyncio.gather(
+                independent(),
+                dependent(),
+                return_exceptions=True,
+            )
+            assert first == 3
+            assert isinstance(second, KeyError)
+            assert await independent() == 3
+            # Failed dependencies are retried, rather than failing later calls.
+            with pytest.raises(KeyError):
+                await dependent()
+        assert attempts == 2
+
+    async def test_raises_runtime_error_when_used_after_exit(self):
+        events = []
+
+        @asynccontextmanager
+        async def resource() -> AsyncIterator[int]:
+            events.append(ContextEvent.setup)
+            yield 1
+            events.append(ContextEvent.teardown)
+
+        @resolver
+        async def dependent(value: int = depends(resource)) -> int:
+            return value
+
+        exited = asyncio.Event()
+
+        async def outlive() -> int:
+            await exited.wait()
+            return await dependent()
+
+        async with Scope():
+            task = asyncio.create_task(outlive())
+        exited.set()
+        with pytest.raises(RuntimeError, match="exited"):
+            await task
+        assert events == []
+
+    async def test_gives_each_call_its_own_stream(self):
+        async def numbers() -> AsyncGenerator[int]:
+            for number in range(3):
+                yield number
+
+        @resolver
+        async def collect(stream: AsyncIterator[int] = depends(numbers)) -> list[int]:
+            return [number async for number in stream]
+
+        async with Scope():
+            assert await collect() == [0, 1, 2]
+            assert await collect() == [0, 1, 2]
+
+    async def test_does_not_share_dependencies_outside_of_scope(self):
+        calls = 0
+
+        def provider() -> int:
+            nonlocal calls
+            calls += 1
+            return calls
+
+        @resolver
+        async def dependent(value: int = depends(provider)) -> int:
+            return value
+
+        async with Scope():
+            assert await dependent() == 1
+            assert await dependent() == 1
+        assert await dependent() == 2
+        async with Scope():
+            assert await dependent() == 3
+
+    async def test_can_seed_scope(self):
+        def get_user() -> str:
+            raise NotImplementedError
+
+        @resolver
+        async def dependent(user: str = depends(get_user)) -> str:
+            return user
+
+        async with Scope({get_user: "seeded"}):
+            assert await dependent() == "seeded"
+            assert await seed_context(dependent, {get_user: "seeded"})() == "seeded"
+            with pytest.raises(ValueError, match="already resolved"):
+                await seed_context(dependent, {get_user: "other"})()
+
+    async def test_keeps_stream_dependencies_open_until_exit(self):
+        events = []
+
+        @asynccontextmanager
+        async def get_session() -> AsyncIterator[int]:
+            events.append(ContextEvent.setup)
+            yield 2
+            events.append(ContextEvent.teardown)
+
+        @resolver
+        async def items(session: int = depends(get_session)) -> AsyncIterator[int]:
+            for item in range(3):
+                yield item * session
+
+        async with Scope():
+            assert [item async for item in items()] == [0, 2, 4]
+            assert [item async for item in items()] == [0, 2, 4]
+            assert events == [ContextEvent.setup]
+        assert events == [ContextEvent.setup, ContextEvent.teardown]
+
+    async def test_raises_runtime_error_when_entered_twice(self):
+        scope = Scope()
+        async with scope:
+            with pytest.raises(RuntimeError):
+                await scope.__aenter__()